@@ -0,0 +1,126 @@
+import asyncio
+import concurrent.futures
+import os
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from .pdf_utils import _load_pdf_worker
+from .text_utils import CharacterTextSplitter, TextFileLoader
+from .vectordatabase import VectorDatabase
+
+
+async def _load_file(
+    path: str,
+    executor: concurrent.futures.Executor
+) -> List[str]:
+    """Load one file, sending CPU-bound PDF parsing to the process pool."""
+    if path.lower().endswith(".pdf"):
+        loop = asyncio.get_running_loop()
+        documents, _ = await loop.run_in_executor(executor, _load_pdf_worker, path)
+        return documents
+    return await TextFileLoader(path).aload_documents()
+
+
+async def batch_ingest(
+    paths: List[str],
+    consumer: Callable[[str, List[str]], Awaitable[None]],
+    max_in_flight: int = 32,
+    workers: Optional[int] = None
+) -> None:
+    """
+    Load files concurrently and hand each one to a consumer as it finishes.
+
+    Loading and consumption are pipelined through a bounded queue. A fixed
+    pool of workers producers each loads one file at a time and waits for
+    the queue to accept it before loading the next, so at most
+    workers + max_in_flight loaded files are held in memory at once.
+
+    Args:
+        paths: Paths of .pdf or .txt files to ingest
+        consumer: Coroutine function called with (path, documents) per file
+        max_in_flight: Maximum number of loaded files waiting for the consumer
+        workers: Maximum number of files parsed at once (defaults to CPU count)
+    """
+    workers = workers or os.cpu_count() or 1
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max_in_flight)
+    pending = iter(paths)
+    executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+
+    async def produce() -> None:
+        # Producers share one path iterator and keep their file until it is queued
+        for path in pending:
+            documents = await _load_file(path, executor)
+            await queue.put((path, documents))
+
+    async def consume() -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            await consumer(*item)
+
+    async def produce_all() -> None:
+        await asyncio.gather(*(produce() for _ in range(min(workers, len(paths)))))
+        await queue.put(None)
+
+    producer_task = asyncio.create_task(produce_all())
+    consumer_task = asyncio.create_task(consume())
+    try:
+        # A failing consumer would otherwise leave producers blocked on a
+        # full queue forever, so stop as soon as either side raises.
+        done, _ = await asyncio.wait(
+            {producer_task, consumer_task},
+            return_when=asyncio.FIRST_EXCEPTION
+        )
+        for task in done:
+            task.result()
+        await consumer_task
+    finally:
+        for task in (producer_task, consumer_task):
+            task.cancel()
+        await asyncio.gather(producer_task, consumer_task, return_exceptions=True)
+        # Don't block the event loop joining workers; drop parses not yet started
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def async_ingest(
+    paths: List[str],
+    vector_db: VectorDatabase,
+    text_splitter: Optional[CharacterTextSplitter] = None,
+    max_in_flight: int = 32,
+    workers: Optional[int] = None
+) -> Dict[str, int]:
+    """
+    Load, chunk and embed files into a vector database.
+
+    Built on batch_ingest, so embedding requests for one file run while
+    the process pool is still parsing the next ones. Each chunk is stored
+    with its file name and chunk index as metadata.
+
+    Args:
+        paths: Paths of .pdf or .txt files to ingest
+        vector_db: Vector database with an embedding model to store chunks in
+        text_splitter: Splitter for the loaded documents (defaults to CharacterTextSplitter())
+        max_in_flight: Maximum number of loaded files waiting to be embedded
+        workers: Maximum number of files parsed at once (defaults to CPU count)
+
+    Returns:
+        Number of chunks stored for each path
+    """
+    if not vector_db.embedding_model:
+        raise ValueError("Embedding model not initialized. Please provide an embedding model with a valid API key.")
+
+    text_splitter = text_splitter or CharacterTextSplitter()
+    chunk_counts: Dict[str, int] = {}
+
+    async def embed(path: str, documents: List[str]) -> None:
+        # Strip once at ingest; str.strip() at query time is then a no-op
+        chunks = [chunk.strip() for chunk in text_splitter.split_texts(documents)]
+        chunks = [chunk for chunk in chunks if chunk]
+        embeddings = await vector_db.embedding_model.async_get_embeddings(chunks)
+        filename = os.path.basename(path)
+        for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
+            vector_db.insert(chunk, embedding, {"filename": filename, "chunk_index": i})
+        chunk_counts[path] = len(chunks)
+
+    await batch_ingest(paths, embed, max_in_flight=max_in_flight, workers=workers)
+    return chunk_counts
@@ -1,13 +1,17 @@
 import logging
-from openai import OpenAI
 from typing import List, Optional
 import os
 from dotenv import load_dotenv
+from .clients import get_async_openai_client, get_openai_client
+
+# Load .env once per process; __init__ only reads the environment
+load_dotenv()
+
+# Completion settings applied unless the caller passes their own
+DEFAULT_COMPLETION_PARAMS = {"temperature": 0.2, "max_tokens": 1024}
 
 class ChatOpenAI:
     def __init__(self, model_name: str = "gpt-4o-mini", api_key: Optional[str] = None):
-        load_dotenv()
-        
         # Use provided API key or fallback to environment variable
         if api_key:
             self.openai_api_key = api_key
@@ -20,7 +24,22 @@ class ChatOpenAI:
             )
         
         self.model_name = model_name
-        self.client = OpenAI(api_key=self.openai_api_key)
+        self.client = get_openai_client(self.openai_api_key)
+        self.async_client = get_async_openai_client(self.openai_api_key)
+
+    def warmup(self) -> None:
+        """
+        Open a pooled connection with a one-token completion, so the first
+        real question skips the handshake. Failures are logged rather than raised.
+        """
+        try:
+            self.client.chat.completions.create(
+                model=self.model_name,
+                messages=[{"role": "user", "content": " "}],
+                max_tokens=1
+            )
+        except Exception as e:
+            logging.warning(f"Chat model warmup failed: {e}")
 
     def run(self, messages, text_only: bool = True, **kwargs):
         """
@@ -29,44 +48,19 @@ class ChatOpenAI:
         Args:
             messages: List of message objects or prompts
             text_only: Whether to return only the text content
-            **kwargs: Additional arguments for the chat completion
+            **kwargs: Additional arguments for the chat completion; these
+                override DEFAULT_COMPLETION_PARAMS
             
         Returns:
             String response if text_only=True, otherwise full response object
         """
         try:
-            # Convert messages to the format expected by OpenAI
-            formatted_messages = []
-            for message in messages:
-                if hasattr(message, 'create_message'):
-                    # RolePrompt object with create_message method
-                    formatted_messages.append(message.create_message())
-                elif hasattr(message, 'role') and hasattr(message, 'prompt'):
-                    # RolePrompt object without using create_message
-                    formatted_messages.append({
-                        "role": message.role,
-                        "content": message.prompt
-                    })
-                elif hasattr(message, 'role') and hasattr(message, 'content'):
-                    # Message object with role and content attributes
-                    formatted_messages.append({
-                        "role": message.role,
-                        "content": message.content
-                    })
-                elif isinstance(message, dict):
-                    # Already in dict format
-                    formatted_messages.append(message)
-                else:
-                    # Assume it's a string and treat as user message
-                    formatted_messages.append({
-                        "role": "user",
-                        "content": str(message)
-                    })
+            formatted_messages = self._format_messages(messages)
             
             response = self.client.chat.completions.create(
                 model=self.model_name,
                 messages=formatted_messages,
-                **kwargs
+                **{**DEFAULT_COMPLETION_PARAMS, **kwargs}
             )
             
             if text_only:
@@ -77,3 +71,66 @@ class ChatOpenAI:
         except Exception as e:
             logging.error(f"Error in ChatOpenAI.run: {e}")
             raise
+
+    async def astream(self, messages, **kwargs):
+        """
+        Stream the chat model's response text as it is generated, without
+        blocking the event loop.
+        
+        Args:
+            messages: List of message objects or prompts
+            **kwargs: Additional arguments for the chat completion
+            
+        Yields:
+            Text fragments of the response
+        """
+        try:
+            stream = await self.async_client.chat.completions.create(
+                model=self.model_name,
+                messages=self._format_messages(messages),
+                stream=True,
+                **{**DEFAULT_COMPLETION_PARAMS, **kwargs}
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content is not None:
+                    yield chunk.choices[0].delta.content
+                    
+        except Exception as e:
+            logging.error(f"Error in ChatOpenAI.astream: {e}")
+            raise
+
+    @staticmethod
+    def _format_messages(messages) -> List[dict]:
+        """Convert prompts, message objects, dicts and strings to OpenAI message dicts."""
+        if all(isinstance(message, dict) for message in messages):
+            # Already in the expected format; skip the per-message attribute probing
+            return list(messages)
+        
+        # Convert messages to the format expected by OpenAI
+        formatted_messages = []
+        for message in messages:
+            if hasattr(message, 'create_message'):
+                # RolePrompt object with create_message method
+                formatted_messages.append(message.create_message())
+            elif hasattr(message, 'role') and hasattr(message, 'prompt'):
+                # RolePrompt object without using create_message
+                formatted_messages.append({
+                    "role": message.role,
+                    "content": message.prompt
+                })
+            elif hasattr(message, 'role') and hasattr(message, 'content'):
+                # Message object with role and content attributes
+                formatted_messages.append({
+                    "role": message.role,
+                    "content": message.content
+                })
+            elif isinstance(message, dict):
+                # Already in dict format
+                formatted_messages.append(message)
+            else:
+                # Assume it's a string and treat as user message
+                formatted_messages.append({
+                    "role": "user",
+                    "content": str(message)
+                })
+        return formatted_messages
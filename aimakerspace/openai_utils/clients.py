@@ -0,0 +1,33 @@
+import functools
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+# Keep sockets open between queries so repeat calls skip the TCP/TLS handshake.
+CONNECTION_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=100,
+    keepalive_expiry=60,
+)
+
+
+@functools.lru_cache(maxsize=32)
+def get_openai_client(api_key: str) -> OpenAI:
+    """Return a process-wide OpenAI client for this API key, sharing its connection pool."""
+    return OpenAI(
+        api_key=api_key,
+        http_client=DefaultHttpxClient(limits=CONNECTION_LIMITS),
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def get_async_openai_client(api_key: str) -> AsyncOpenAI:
+    """
+    Return a process-wide AsyncOpenAI client for this API key.
+
+    The underlying connection pool is bound to the event loop that first
+    uses it, which suits a long-running server with a single loop.
+    """
+    return AsyncOpenAI(
+        api_key=api_key,
+        http_client=DefaultAsyncHttpxClient(limits=CONNECTION_LIMITS),
+    )
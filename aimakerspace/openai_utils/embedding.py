@@ -1,15 +1,97 @@
 from dotenv import load_dotenv
-from openai import AsyncOpenAI, OpenAI
+import logging
 import openai
-from typing import List, Optional
+from collections import OrderedDict
+from typing import Callable, Iterator, List, Optional, Tuple
+import functools
 import os
 import asyncio
+import random
+import threading
+from .clients import get_async_openai_client, get_openai_client
+
+# Read .env once at import rather than on every model construction
+load_dotenv()
+
+try:
+    import tiktoken
+except ImportError:  # optional: fall back to a byte-length upper bound
+    tiktoken = None
+
+# Errors worth retrying with backoff when embedding batches
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError)
+
+@functools.lru_cache(maxsize=8)
+def _token_counter(model_name: str) -> Callable[[str], int]:
+    """Return a token-count function for the model, or a UTF-8 byte count fallback."""
+    if tiktoken is not None:
+        try:
+            encoding = tiktoken.encoding_for_model(model_name)
+            return lambda text: len(encoding.encode(text, disallowed_special=()))
+        except Exception:
+            pass
+    # Every BPE token covers at least one byte, so this never undercounts
+    return lambda text: len(text.encode("utf-8"))
+
+
+def prefetch_tokenizer(model_name: str = "text-embedding-3-small") -> None:
+    """Load the model's tokenizer now so the first batch doesn't pay for the BPE download."""
+    _token_counter(model_name)
+
+
+def _pack_batches(
+    list_of_text: List[str],
+    count_tokens: Callable[[str], int],
+    max_tokens: int,
+    max_items: int
+) -> Iterator[List[str]]:
+    """Greedily group texts into order-preserving batches under both limits."""
+    batch: List[str] = []
+    batch_tokens = 0
+    for text in list_of_text:
+        tokens = count_tokens(text)
+        if batch and (batch_tokens + tokens > max_tokens or len(batch) >= max_items):
+            yield batch
+            batch, batch_tokens = [], 0
+        batch.append(text)
+        batch_tokens += tokens
+    if batch:
+        yield batch
+
+
+# Process-wide LRU of query embeddings keyed by (model, normalized query text)
+QUERY_CACHE_SIZE = 1024
+_query_cache: "OrderedDict[Tuple[str, str], Tuple[float, ...]]" = OrderedDict()
+_query_cache_lock = threading.Lock()
+
+
+def _get_cached_query(key: Tuple[str, str]) -> Optional[List[float]]:
+    with _query_cache_lock:
+        embedding = _query_cache.get(key)
+        if embedding is None:
+            return None
+        _query_cache.move_to_end(key)
+    return list(embedding)
+
+
+def _cache_query(key: Tuple[str, str], embedding: List[float]) -> None:
+    with _query_cache_lock:
+        _query_cache[key] = tuple(embedding)
+        _query_cache.move_to_end(key)
+        if len(_query_cache) > QUERY_CACHE_SIZE:
+            _query_cache.popitem(last=False)
 
 
 class EmbeddingModel:
-    def __init__(self, embeddings_model_name: str = "text-embedding-3-small", api_key: Optional[str] = None):
-        load_dotenv()
-        
+    def __init__(
+        self,
+        embeddings_model_name: str = "text-embedding-3-small",
+        api_key: Optional[str] = None,
+        max_concurrency: int = 8,
+        max_attempts: int = 6,
+        max_batch_tokens: int = 250_000,
+        max_batch_items: int = 2048
+    ):
         # Use provided API key or fallback to environment variable
         if api_key:
             self.openai_api_key = api_key
@@ -21,24 +103,61 @@ class EmbeddingModel:
                 "OpenAI API key must be provided either as a parameter or through OPENAI_API_KEY environment variable."
             )
         
-        # Initialize clients with the API key
-        self.async_client = AsyncOpenAI(api_key=self.openai_api_key)
-        self.client = OpenAI(api_key=self.openai_api_key)
+        # Shared clients reuse pooled connections across instances
+        self.async_client = get_async_openai_client(self.openai_api_key)
+        self.client = get_openai_client(self.openai_api_key)
         
         openai.api_key = self.openai_api_key
         self.embeddings_model_name = embeddings_model_name
+        # Caps in-flight batch requests so large corpora stay under rate limits
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        # Per-request limits; the API rejects requests over 300k tokens
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_items = max_batch_items
+
+    def warmup(self) -> None:
+        """
+        Load the tokenizer and open a pooled connection with a one-token
+        request, so the first real embedding call skips the handshake.
+        Failures are logged rather than raised.
+        """
+        prefetch_tokenizer(self.embeddings_model_name)
+        try:
+            self.get_embedding(" ")
+        except Exception as e:
+            logging.warning(f"Embedding warmup failed: {e}")
 
     async def async_get_embeddings(self, list_of_text: List[str]) -> List[List[float]]:
-        batch_size = 1024
-        batches = [list_of_text[i:i + batch_size] for i in range(0, len(list_of_text), batch_size)]
+        batches = _pack_batches(
+            list_of_text,
+            _token_counter(self.embeddings_model_name),
+            self.max_batch_tokens,
+            self.max_batch_items
+        )
+        
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        # The backoff below is the only retry layer; SDK retries would multiply
+        # requests and sleep while holding a semaphore slot. The copy shares
+        # the pooled connections.
+        client = self.async_client.with_options(max_retries=0)
         
         async def process_batch(batch):
-            embedding_response = await self.async_client.embeddings.create(
-                input=batch, model=self.embeddings_model_name
-            )
+            async with semaphore:
+                for attempt in range(self.max_attempts):
+                    try:
+                        embedding_response = await client.embeddings.create(
+                            input=batch, model=self.embeddings_model_name
+                        )
+                        break
+                    except RETRYABLE_ERRORS:
+                        if attempt == self.max_attempts - 1:
+                            raise
+                        # Exponential backoff with jitter, capped at 30 seconds
+                        await asyncio.sleep(min(30, 2 ** attempt) * (0.5 + random.random() / 2))
             return [embeddings.embedding for embeddings in embedding_response.data]
         
-        # Use asyncio.gather to process all batches concurrently
+        # Batches run concurrently, bounded by the semaphore
         results = await asyncio.gather(*[process_batch(batch) for batch in batches])
         
         # Flatten the results
@@ -65,6 +184,26 @@ class EmbeddingModel:
 
         return embedding.data[0].embedding
 
+    def get_query_embedding(self, query: str) -> List[float]:
+        """Embed a search query, reusing the result for repeated questions."""
+        text = " ".join(query.split())
+        key = (self.embeddings_model_name, text)
+        embedding = _get_cached_query(key)
+        if embedding is None:
+            embedding = self.get_embedding(text)
+            _cache_query(key, embedding)
+        return embedding
+
+    async def async_get_query_embedding(self, query: str) -> List[float]:
+        """Async variant of get_query_embedding sharing the same cache."""
+        text = " ".join(query.split())
+        key = (self.embeddings_model_name, text)
+        embedding = _get_cached_query(key)
+        if embedding is None:
+            embedding = await self.async_get_embedding(text)
+            _cache_query(key, embedding)
+        return embedding
+
 
 if __name__ == "__main__":
     embedding_model = EmbeddingModel()
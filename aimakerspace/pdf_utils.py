@@ -1,19 +1,82 @@
+import asyncio
+import concurrent.futures
+import hashlib
+import json
 import logging
-from typing import List, Optional
+import os
+import tempfile
+from typing import Iterator, List, Optional, Tuple
+import pypdf
 from pypdf import PdfReader
 
+try:
+    import pymupdf
+except ImportError:  # optional: native extraction, much faster than pypdf on long PDFs
+    pymupdf = None
+
+# Upper bound on load_many worker processes, to avoid oversubscribing shared hosts.
+MAX_LOAD_WORKERS = 32
+
+# PDFs with more pages than this have their pages extracted across processes.
+PARALLEL_PAGE_THRESHOLD = 8
+
+# Opt-in directory for caching extracted page text, keyed by file content and
+# extraction backend. Unset means no caching; entries are never evicted.
+PDF_CACHE_DIR = os.getenv("AIMAKERSPACE_PDF_CACHE_DIR")
+
 class PDFFileLoader:
     """A utility class for loading and extracting text from PDF files."""
     
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, cache_dir: Optional[str] = None):
         """
         Initialize the PDF loader with a file path.
         
         Args:
             file_path (str): Path to the PDF file
+            cache_dir (Optional[str]): Directory for caching extracted page text;
+                defaults to PDF_CACHE_DIR, and caching is off when both are unset
         """
         self.file_path = file_path
+        self.cache_dir = cache_dir or PDF_CACHE_DIR
         self.reader: Optional[PdfReader] = None
+        self._page_count: Optional[int] = None
+        self._metadata: Optional[dict] = None
+
+    @classmethod
+    def load_many(
+        cls,
+        file_paths: List[str],
+        max_workers: Optional[int] = None
+    ) -> List[Tuple[List[str], dict]]:
+        """
+        Load several PDF files in parallel, one file per worker process.
+        
+        Text extraction is CPU-bound pure Python, so files are spread over
+        processes rather than threads. The worker count can be overridden
+        with the LOAD_DOCUMENTS_NUMBER_OF_THREADS environment variable and
+        is capped at MAX_LOAD_WORKERS.
+        
+        Args:
+            file_paths (List[str]): Paths to the PDF files
+            max_workers (Optional[int]): Number of worker processes
+            
+        Returns:
+            List[Tuple[List[str], dict]]: (documents, metadata) per file, in input order
+        """
+        if not file_paths:
+            return []
+        
+        if max_workers is None:
+            env_workers = os.getenv("LOAD_DOCUMENTS_NUMBER_OF_THREADS")
+            max_workers = int(env_workers) if env_workers else max(1, (os.cpu_count() or 2) - 1)
+        max_workers = min(max_workers, len(file_paths), MAX_LOAD_WORKERS)
+        
+        if max_workers <= 1:
+            return [_load_pdf_worker(path) for path in file_paths]
+        
+        chunksize = max(1, len(file_paths) // (4 * max_workers))
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(_load_pdf_worker, file_paths, chunksize=chunksize))
         
     def _load_reader(self) -> None:
         """Load the PDF reader if not already loaded."""
@@ -24,64 +87,260 @@ class PDFFileLoader:
                 logging.error(f"Failed to load PDF file {self.file_path}: {e}")
                 raise
     
-    def load_documents(self) -> List[str]:
+    def load_documents(
+        self,
+        max_workers: Optional[int] = 1,
+        force_refresh: bool = False
+    ) -> List[str]:
         """
         Extract text from all pages of the PDF.
         
+        When a cache directory is configured, results are stored there keyed
+        by a hash of the file contents and the backend that extracted them,
+        so re-indexing the same PDF skips extraction.
+        
+        If pymupdf is installed its native extractor is used. Otherwise,
+        since pypdf's text extraction is CPU-bound pure Python, batch callers
+        can pass max_workers to split PDFs longer than PARALLEL_PAGE_THRESHOLD
+        pages into contiguous page ranges extracted in separate processes.
+        The default stays in-process, so servers don't fork a pool per request.
+        
+        Args:
+            max_workers (Optional[int]): Worker processes for long PDFs; 1 keeps extraction
+                in-process and None uses one per CPU
+            force_refresh (bool): Ignore any cached text and extract again
+            
         Returns:
             List[str]: List of text content from each page
         """
+        if not self.cache_dir:
+            return self._extract_documents(max_workers)[0]
+        
+        file_hash = self._file_hash()
+        if not force_refresh:
+            # pymupdf can fail on a file and fall back, so also try the pypdf entry
+            for backend in _available_backends():
+                documents = _read_page_cache(self._cache_path(file_hash, backend))
+                if documents is not None:
+                    return documents
+        
+        documents, backend = self._extract_documents(max_workers)
+        _write_page_cache(self._cache_path(file_hash, backend), documents)
+        return documents
+    
+    def _file_hash(self) -> str:
+        """Hash of the file's current contents."""
+        hasher = hashlib.blake2b(digest_size=16)
+        with open(self.file_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                hasher.update(block)
+        return hasher.hexdigest()
+    
+    def _cache_path(self, file_hash: str, backend: str) -> str:
+        """Path of the cache entry for text extracted from this content by this backend."""
+        return os.path.join(self.cache_dir, f"{file_hash}-{backend}.json")
+    
+    def _extract_documents(self, max_workers: Optional[int]) -> Tuple[List[str], str]:
+        """
+        Extract page text with pymupdf when installed, else pypdf in parallel
+        for long PDFs. Returns the pages and the backend that produced them.
+        """
+        if pymupdf is not None:
+            try:
+                return _extract_with_pymupdf(self.file_path), _PYMUPDF_BACKEND
+            except Exception as e:
+                logging.warning(f"pymupdf could not read {self.file_path}, falling back to pypdf: {e}")
+        
+        # Plan ranges from the real page tree, not the file's /Count entry,
+        # which can be wrong and would silently drop pages
+        self._load_reader()
+        page_count = len(self.reader.pages) if self.reader else 0
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        workers = min(
+            max_workers,
+            MAX_LOAD_WORKERS,
+            -(-page_count // PARALLEL_PAGE_THRESHOLD)
+        )
+        
+        if workers <= 1:
+            return list(self.iter_documents()), _PYPDF_BACKEND
+        
+        step = -(-page_count // workers)
+        ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_extract_pages_worker, self.file_path, start, stop)
+                for start, stop in ranges
+            ]
+            return [text for future in futures for text in future.result()], _PYPDF_BACKEND
+    
+    def iter_documents(self) -> Iterator[str]:
+        """
+        Lazily extract text page by page.
+        
+        Lets callers start chunking and embedding the first pages before
+        the rest of the document has been parsed.
+        
+        Yields:
+            str: Text content of each non-empty page
+        """
+        return self._iter_page_texts(0, None)
+    
+    def _iter_page_texts(self, start: int, stop: Optional[int]) -> Iterator[str]:
+        """Yield stripped, non-empty text for pages in [start, stop)."""
         self._load_reader()
         
         if not self.reader:
-            return []
+            return
         
-        documents = []
+        pages = self.reader.pages
+        if stop is None:
+            stop = len(pages)
         
         try:
-            for page_num, page in enumerate(self.reader.pages):
+            for page_num in range(start, stop):
                 try:
-                    text = page.extract_text()
-                    if text.strip():  # Only add non-empty pages
-                        documents.append(text.strip())
+                    text = pages[page_num].extract_text().strip()
                 except Exception as e:
                     logging.warning(f"Failed to extract text from page {page_num + 1}: {e}")
                     continue
+                if text:  # Only yield non-empty pages
+                    yield text
                     
         except Exception as e:
             logging.error(f"Failed to process PDF pages: {e}")
             raise
+    
+    async def aload_documents(self) -> List[str]:
+        """
+        Extract text from all pages without blocking the event loop.
         
-        return documents
+        pypdf has no async API, so extraction runs in a worker thread.
+        
+        Returns:
+            List[str]: List of text content from each page
+        """
+        return await asyncio.to_thread(self.load_documents)
     
     def get_page_count(self) -> int:
         """
         Get the number of pages in the PDF.
         
+        This is the count the file declares, which is cheap but unverified;
+        extraction plans its work from the actual page tree instead.
+        
         Returns:
             int: Number of pages
         """
+        if self._page_count is not None:
+            return self._page_count
+        
         self._load_reader()
         
         if not self.reader:
             return 0
-            
-        return len(self.reader.pages)
+        
+        # len(reader.pages) flattens the whole page tree, so read the count
+        # from the root /Pages node and only fall back when it is unusable
+        try:
+            count = int(self.reader.trailer["/Root"]["/Pages"]["/Count"])
+        except (KeyError, TypeError, ValueError, pypdf.errors.PyPdfError):
+            count = -1
+        self._page_count = count if count >= 0 else len(self.reader.pages)
+        return self._page_count
     
-    def get_metadata(self) -> dict:
+    def get_metadata(self, force_refresh: bool = False) -> dict:
         """
         Get PDF metadata.
         
+        The result is kept on the loader; force_refresh re-reads the file,
+        e.g. after it has changed on disk.
+        
+        Args:
+            force_refresh (bool): Discard the cached reader, page count and metadata first
+            
         Returns:
             dict: PDF metadata
         """
-        self._load_reader()
+        if force_refresh:
+            self.close()
+            self._page_count = None
+            self._metadata = None
         
-        if not self.reader or not self.reader.metadata:
-            return {}
-        
-        metadata = {}
-        for key, value in self.reader.metadata.items():
-            metadata[key] = str(value) if value else ""
+        if self._metadata is None:
+            self._load_reader()
+            
+            info = self.reader.metadata if self.reader else None
+            self._metadata = {
+                key: str(value) if value else ""
+                for key, value in (info or {}).items()
+            }
         
-        return metadata 
\ No newline at end of file
+        # Hand out a copy so callers can't alter the cached dict
+        return dict(self._metadata)
+    
+    def close(self) -> None:
+        """Release the parsed PDF so its buffers are freed without waiting for GC."""
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
+    
+    def __enter__(self) -> "PDFFileLoader":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+_PYPDF_BACKEND = f"pypdf-{pypdf.__version__}"
+_PYMUPDF_BACKEND = f"pymupdf-{pymupdf.VersionBind}" if pymupdf is not None else None
+
+
+def _available_backends() -> List[str]:
+    """Extraction backends in the order load_documents tries them."""
+    return [backend for backend in (_PYMUPDF_BACKEND, _PYPDF_BACKEND) if backend]
+
+
+def _read_page_cache(cache_path: str) -> Optional[List[str]]:
+    """Return cached page text, or None on a miss or unreadable entry."""
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return json.load(f)["pages"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _write_page_cache(cache_path: str, documents: List[str]) -> None:
+    """Atomically store page text; failures (e.g. read-only disk) are non-fatal."""
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"pages": documents}, f)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        logging.warning(f"Could not write PDF cache entry {cache_path}: {e}")
+
+
+def _load_pdf_worker(file_path: str) -> Tuple[List[str], dict]:
+    """Load one PDF inside a worker process and return its text and metadata."""
+    with PDFFileLoader(file_path) as loader:
+        # Already inside a worker process, so keep page extraction in-process
+        return loader.load_documents(max_workers=1), loader.get_metadata()
+
+
+def _extract_with_pymupdf(file_path: str) -> List[str]:
+    """Extract stripped, non-empty page text using MuPDF's native extractor."""
+    with pymupdf.open(file_path) as doc:
+        return [text for text in (page.get_text("text").strip() for page in doc) if text]
+
+
+def _extract_pages_worker(file_path: str, start: int, stop: int) -> List[str]:
+    """Extract one contiguous page range inside a worker process."""
+    with PDFFileLoader(file_path) as loader:
+        return list(loader._iter_page_texts(start, stop))
@@ -1,8 +1,14 @@
+import asyncio
 import logging
-from typing import List, Dict, Any, Tuple, Optional
+from typing import AsyncIterator, List, Dict, Any, Tuple, Optional
 from .vectordatabase import VectorDatabase
 from .openai_utils.chatmodel import ChatOpenAI
-from .openai_utils.prompts import SystemRolePrompt, UserRolePrompt
+from .openai_utils.prompts import SystemRolePrompt
+
+logger = logging.getLogger(__name__)
+
+# Output token caps per response style, so concise answers stop decoding early
+MAX_TOKENS_BY_STYLE = {"concise": 512, "detailed": 2048}
 
 class RAGPipeline:
     """
@@ -27,6 +33,7 @@ class RAGPipeline:
         self.llm = llm
         self.vector_db = vector_db
         self.response_style = response_style
+        self._max_tokens = MAX_TOKENS_BY_STYLE.get(response_style, 1024)
         
         # System prompt for RAG responses
         self.system_prompt = SystemRolePrompt("""You are a helpful assistant that answers questions based on provided document context. 
@@ -39,6 +46,17 @@ When answering:
 5. Format your response clearly with proper markdown
 
 Context format: Each piece of context will be marked with [Source: filename] followed by the content.""")
+        # The system prompt never changes, so convert it to a message dict once
+        self._system_message = self.system_prompt.create_message()
+
+    def warmup(self) -> None:
+        """
+        Warm the embedding and chat connections before the first question.
+        Blocking; run it in a thread or background task from async code.
+        """
+        if self.vector_db.embedding_model is not None:
+            self.vector_db.embedding_model.warmup()
+        self.llm.warmup()
 
     def search_documents(
         self, 
@@ -58,46 +76,84 @@ Context format: Each piece of context will be marked with [Source: filename] fol
             List of search results with content and metadata
         """
         try:
-            print(f"🔍 RAG DEBUG: Searching for query: {query}")
-            
-            # Get query embedding
-            query_vector = self.vector_db.embedding_model.get_embedding(query)
-            print(f"🔍 RAG DEBUG: Generated query embedding, shape: {len(query_vector)}")
-            
-            # Use the vector database's search method
-            search_results = self.vector_db.search(query_vector, k=k)
-            print(f"🔍 RAG DEBUG: Raw search results count: {len(search_results)}")
-            
-            formatted_results = []
-            for i, (key, score) in enumerate(search_results):
-                print(f"🔍 RAG DEBUG: Result {i+1}:")
-                print(f"  - Score: {score}")
-                print(f"  - Key type: {type(key)}")
-                print(f"  - Key preview: {str(key)[:200]}...")
-                
-                formatted_result = {
-                    "text": key,  # The key is the text content
-                    "score": score
-                }
-                
-                if return_metadata:
-                    metadata = self.vector_db.get_metadata(key)
-                    if metadata:
-                        formatted_result["metadata"] = metadata
-                        print(f"  - Metadata: {metadata}")
-                
-                formatted_results.append(formatted_result)
+            logger.debug("Searching for query: %s", query)
+            
+            # Get query embedding (cached for repeated questions)
+            query_vector = self.vector_db.embedding_model.get_query_embedding(query)
+            return self._collect_results(query_vector, k, return_metadata)
+            
+        except Exception as e:
+            logger.error("Error searching documents: %s", e)
+            return []
+
+    async def asearch_documents(
+        self, 
+        query: str, 
+        k: int = 4, 
+        return_metadata: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Async variant of search_documents that awaits the query embedding,
+        so a server can handle many questions concurrently.
+        
+        Args:
+            query: The search query
+            k: Number of top results to return
+            return_metadata: Whether to include metadata in results
+            
+        Returns:
+            List of search results with content and metadata
+        """
+        try:
+            logger.debug("Searching for query: %s", query)
             
-            return formatted_results
+            query_vector = await self.vector_db.embedding_model.async_get_query_embedding(query)
+            return self._collect_results(query_vector, k, return_metadata)
             
         except Exception as e:
-            logging.error(f"Error searching documents: {e}")
+            logger.error("Error searching documents: %s", e)
             return []
 
+    def _collect_results(
+        self, 
+        query_vector: List[float], 
+        k: int, 
+        return_metadata: bool
+    ) -> List[Dict[str, Any]]:
+        """Run the vector search and attach text, score and metadata to each hit."""
+        # Use the vector database's search method
+        search_results = self.vector_db.search(query_vector, k=k)
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("Raw search results count: %d", len(search_results))
+        
+        # Fetch all metadata in one call rather than one lookup per hit
+        if return_metadata:
+            metadatas = self.vector_db.get_metadata_batch([key for key, _ in search_results])
+        else:
+            metadatas = [None] * len(search_results)
+        
+        formatted_results = []
+        for i, ((key, score), metadata) in enumerate(zip(search_results, metadatas)):
+            if debug:
+                logger.debug("Result %d: score=%.3f preview=%.200r", i + 1, score, key)
+            
+            formatted_result = {
+                "text": key,  # The key is the text content
+                "score": score
+            }
+            
+            if metadata:
+                formatted_result["metadata"] = metadata
+            
+            formatted_results.append(formatted_result)
+        
+        return formatted_results
+
     def format_context(
         self, 
         search_results: List[Dict[str, Any]]
-    ) -> Tuple[str, str]:
+    ) -> Tuple[str, str, List[str]]:
         """
         Format search results into context for the language model.
         
@@ -105,44 +161,44 @@ Context format: Each piece of context will be marked with [Source: filename] fol
             search_results: List of search results
             
         Returns:
-            Tuple of (formatted_context, metadata_info)
+            Tuple of (formatted_context, metadata_info, sources), where sources
+            lists each source filename once, in ranking order
         """
-        print(f"📝 RAG DEBUG: Formatting context from {len(search_results)} results")
-        
         if not search_results:
-            return "", ""
+            return "", "", []
         
         context_parts = []
         metadata_parts = []
+        sources = []
         
+        # One pass: each result's text is stripped and its fields read once
         for i, result in enumerate(search_results):
             content = result.get("text", "").strip()
+            if not content:
+                continue
             metadata = result.get("metadata", {})
-            score = result.get("score", 0.0)
             
-            print(f"📝 RAG DEBUG: Processing result {i+1}:")
-            print(f"  - Content type: {type(content)}")
-            print(f"  - Content length: {len(content)}")
-            print(f"  - Content preview: {content[:100]}...")
+            # Format with source information
+            filename = metadata.get("filename", f"Document {i+1}")
+            context_parts.append(f"[Source: {filename}]\n{content}")
             
-            if content:
-                # Format with source information
-                filename = metadata.get("filename", f"Document {i+1}")
-                context_parts.append(f"[Source: {filename}]\n{content}")
-                
-                # Collect metadata info
-                metadata_info = f"Source: {filename}, Relevance: {score:.3f}"
-                if "chunk_index" in metadata:
-                    metadata_info += f", Chunk: {metadata['chunk_index']}"
-                metadata_parts.append(metadata_info)
+            # Collect metadata info
+            metadata_part = f"Source: {filename}, Relevance: {result.get('score', 0.0):.3f}"
+            if "chunk_index" in metadata:
+                metadata_part += f", Chunk: {metadata['chunk_index']}"
+            metadata_parts.append(metadata_part)
+            
+            if "filename" in metadata:
+                sources.append(metadata["filename"])
         
         formatted_context = "\n\n---\n\n".join(context_parts)
         metadata_info = " | ".join(metadata_parts)
+        # dict.fromkeys drops repeated files but keeps ranking order
+        sources = list(dict.fromkeys(sources))
         
-        print(f"📝 RAG DEBUG: Final context length: {len(formatted_context)}")
-        print(f"📝 RAG DEBUG: Final context preview: {formatted_context[:300]}...")
+        logger.debug("Formatted context from %d results, length %d", len(search_results), len(formatted_context))
         
-        return formatted_context, metadata_info
+        return formatted_context, metadata_info, sources
 
     def generate_response(
         self, 
@@ -162,26 +218,56 @@ Context format: Each piece of context will be marked with [Source: filename] fol
             The generated response
         """
         try:
-            # Create the user prompt with context
-            user_prompt_text = f"""Question: {query}
-
-Context from documents:
-{context}
-
-Please answer the question based on the provided context."""
-
-            user_prompt = UserRolePrompt(user_prompt_text)
-            
             # Generate response using the chat model
-            messages = [self.system_prompt, user_prompt]
-            response = self.llm.run(messages)
+            messages = self._build_messages(query, context)
+            response = self.llm.run(messages, max_tokens=self._max_tokens)
             
             return response
             
         except Exception as e:
-            logging.error(f"Error generating response: {e}")
+            logger.error("Error generating response: %s", e)
             return f"I encountered an error while generating a response: {str(e)}"
 
+    async def stream_generate(
+        self, 
+        query: str, 
+        context: str
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response for the provided context as the model produces it,
+        so callers can show the first tokens without waiting for the rest.
+        
+        Args:
+            query: The user's question
+            context: The relevant document context
+            
+        Yields:
+            Text fragments of the generated response
+        """
+        try:
+            async for token in self.llm.astream(
+                self._build_messages(query, context), max_tokens=self._max_tokens
+            ):
+                yield token
+                
+        except Exception as e:
+            logger.error("Error generating response: %s", e)
+            yield f"I encountered an error while generating a response: {str(e)}"
+
+    def _build_messages(self, query: str, context: str) -> List[Dict[str, str]]:
+        """Build the system and user messages for a question and its context."""
+        # Create the user prompt with context
+        user_prompt_text = f"""Question: {query}
+
+Context from documents:
+{context}
+
+Please answer the question based on the provided context."""
+
+        # A plain dict skips prompt templating, which would re-parse every
+        # query and mangle or reject context text containing braces
+        return [self._system_message, {"role": "user", "content": user_prompt_text}]
+
     def run(
         self, 
         query: str, 
@@ -209,29 +295,70 @@ Please answer the question based on the provided context."""
                 }
             
             # Step 2: Format context
-            context, metadata_info = self.format_context(search_results)
+            context, metadata_info, sources = self.format_context(search_results)
             
             # Step 3: Generate response
             response = self.generate_response(query, context, metadata_info)
             
-            # Extract source information
-            sources = []
-            for result in search_results:
-                metadata = result.get("metadata", {})
-                if "filename" in metadata:
-                    sources.append(metadata["filename"])
+            return {
+                "response": response,
+                "sources": sources,
+                "metadata": metadata_info,
+                "search_results": search_results
+            }
+            
+        except Exception as e:
+            logger.error("Error in RAG pipeline: %s", e)
+            return {
+                "response": f"I encountered an error while processing your question: {str(e)}",
+                "sources": [],
+                "metadata": f"Error: {str(e)}"
+            }
+
+    async def arun(
+        self, 
+        query: str, 
+        k: int = 4
+    ) -> Dict[str, Any]:
+        """
+        Async variant of run. Callers with several questions can await
+        them together with asyncio.gather.
+        
+        Args:
+            query: The user's question
+            k: Number of documents to retrieve
+            
+        Returns:
+            Dictionary containing the response and metadata
+        """
+        try:
+            search_results = await self.asearch_documents(query, k=k, return_metadata=True)
+            
+            if not search_results:
+                return {
+                    "response": "I couldn't find any relevant information in the uploaded documents to answer your question.",
+                    "sources": [],
+                    "metadata": "No relevant documents found"
+                }
+            
+            context, metadata_info, sources = self.format_context(search_results)
+            
+            # The chat call is blocking, so keep it off the event loop
+            response = await asyncio.to_thread(
+                self.generate_response, query, context, metadata_info
+            )
             
             return {
                 "response": response,
-                "sources": list(set(sources)),  # Remove duplicates
+                "sources": sources,
                 "metadata": metadata_info,
                 "search_results": search_results
             }
             
         except Exception as e:
-            logging.error(f"Error in RAG pipeline: {e}")
+            logger.error("Error in RAG pipeline: %s", e)
             return {
                 "response": f"I encountered an error while processing your question: {str(e)}",
                 "sources": [],
                 "metadata": f"Error: {str(e)}"
-            } 
\ No newline at end of file
+            }
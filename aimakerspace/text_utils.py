@@ -1,5 +1,14 @@
+import asyncio
+import mmap
 import os
-from typing import List
+import stat
+from typing import Iterator, List
+
+# Files at least this large are decoded straight from a memory map.
+MMAP_THRESHOLD = 1 << 20
+
+# Concurrent reads past this depth stop helping and starve the default executor.
+MAX_CONCURRENT_READS = 16
 
 
 class TextFileLoader:
@@ -9,9 +18,10 @@ class TextFileLoader:
         self.encoding = encoding
 
     def load(self):
-        if os.path.isdir(self.path):
+        mode = self._path_mode()
+        if stat.S_ISDIR(mode):
             self.load_directory()
-        elif os.path.isfile(self.path) and self.path.endswith(".txt"):
+        elif stat.S_ISREG(mode) and self.path.endswith(".txt"):
             self.load_file()
         else:
             raise ValueError(
@@ -19,22 +29,74 @@ class TextFileLoader:
             )
 
     def load_file(self):
-        with open(self.path, "r", encoding=self.encoding) as f:
-            self.documents.append(f.read())
+        self.documents.append(self._read_file(self.path))
 
     def load_directory(self):
         for root, _, files in os.walk(self.path):
             for file in files:
                 if file.endswith(".txt"):
-                    with open(
-                        os.path.join(root, file), "r", encoding=self.encoding
-                    ) as f:
-                        self.documents.append(f.read())
+                    self.documents.append(self._read_file(os.path.join(root, file)))
 
     def load_documents(self):
         self.load()
         return self.documents
 
+    def iter_documents(self) -> Iterator[str]:
+        # Yields one file at a time without accumulating self.documents, so
+        # callers can chunk/embed a large directory without holding it all.
+        for path in self._iter_paths():
+            yield self._read_file(path)
+
+    async def aload_documents(self):
+        # Reads run in worker threads so many files overlap their disk latency
+        # instead of blocking the event loop one after another.
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_READS)
+
+        async def read(path: str) -> str:
+            async with semaphore:
+                return await asyncio.to_thread(self._read_file, path)
+
+        contents = await asyncio.gather(*(read(path) for path in self._iter_paths()))
+        self.documents.extend(contents)
+        return self.documents
+
+    def _iter_paths(self) -> Iterator[str]:
+        mode = self._path_mode()
+        if stat.S_ISDIR(mode):
+            for root, _, files in os.walk(self.path):
+                for file in files:
+                    if file.endswith(".txt"):
+                        yield os.path.join(root, file)
+        elif stat.S_ISREG(mode) and self.path.endswith(".txt"):
+            yield self.path
+        else:
+            raise ValueError(
+                "Provided path is neither a valid directory nor a .txt file."
+            )
+
+    def _path_mode(self) -> int:
+        # A single stat answers both the directory and regular-file checks.
+        try:
+            return os.stat(self.path).st_mode
+        except OSError:
+            return 0
+
+    def _read_file(self, path: str) -> str:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+                return self._decode(f.read())
+            # Decoding from the mapping skips the intermediate bytes copy that
+            # f.read() makes, halving peak memory for large files.
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return self._decode(mm)
+
+    def _decode(self, data) -> str:
+        text = str(data, self.encoding)
+        # Match text-mode universal newline handling.
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
+
 
 class CharacterTextSplitter:
     def __init__(
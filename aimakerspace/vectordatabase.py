@@ -1,6 +1,7 @@
 import numpy as np # type: ignore
 from collections import defaultdict
-from typing import List, Tuple, Callable, Dict, Any, Optional
+from types import MappingProxyType
+from typing import List, Tuple, Callable, Dict, Any, Mapping, Optional
 from aimakerspace.openai_utils.embedding import EmbeddingModel
 import asyncio
 
@@ -15,28 +16,91 @@ def cosine_similarity(vector_a: np.array, vector_b: np.array) -> float:
 
 class VectorDatabase:
     def __init__(self, embedding_model: EmbeddingModel = None):
-        self.vectors = defaultdict(np.array)
+        # Vectors live in one contiguous float32 matrix, one row per key, so a
+        # search is a single matrix-vector product instead of a Python loop
+        self._keys: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._norms = np.empty(0, dtype=np.float32)
         self.metadata = defaultdict(dict)  # Store metadata separately
         # Don't create a default embedding model if none provided - it will fail without API key
         self.embedding_model = embedding_model
 
+    @property
+    def vectors(self) -> Mapping[str, np.ndarray]:
+        """
+        Read-only mapping of key to stored vector. Use insert to add or
+        replace vectors; writing here would bypass the cached norms.
+        """
+        return MappingProxyType({key: self._readonly_row(i) for i, key in enumerate(self._keys)})
+
+    def _readonly_row(self, row: int) -> np.ndarray:
+        view = self._matrix[row]
+        view.flags.writeable = False
+        return view
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
     def insert(self, key: str, vector: np.array, metadata: Optional[Dict[str, Any]] = None) -> None:
         """Insert a vector with optional metadata."""
-        self.vectors[key] = vector
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        row = self._index.get(key)
+        if row is None:
+            row = len(self._keys)
+            self._reserve(row + 1, vector.shape[0])
+            self._keys.append(key)
+            self._index[key] = row
+        self._matrix[row] = vector
+        self._norms[row] = np.linalg.norm(vector)
         if metadata:
             self.metadata[key] = metadata
 
+    def _reserve(self, size: int, dim: int) -> None:
+        """Grow the matrix geometrically so repeated inserts stay amortised O(1)."""
+        capacity, current_dim = self._matrix.shape
+        if self._keys and dim != current_dim:
+            raise ValueError(f"Vector has dimension {dim}, expected {current_dim}")
+        if size <= capacity:
+            return
+        new_capacity = max(size, 2 * capacity, 64)
+        matrix = np.empty((new_capacity, dim), dtype=np.float32)
+        norms = np.empty(new_capacity, dtype=np.float32)
+        count = len(self._keys)
+        if count:
+            matrix[:count] = self._matrix[:count]
+            norms[:count] = self._norms[:count]
+        self._matrix, self._norms = matrix, norms
+
     def search(
         self,
         query_vector: np.array,
         k: int,
         distance_measure: Callable = cosine_similarity,
     ) -> List[Tuple[str, float]]:
-        scores = [
-            (key, distance_measure(query_vector, vector))
-            for key, vector in self.vectors.items()
-        ]
-        return sorted(scores, key=lambda x: x[1], reverse=True)[:k]
+        count = len(self._keys)
+        if count == 0 or k <= 0:
+            return []
+        if distance_measure is not cosine_similarity:
+            scores = [
+                (key, distance_measure(query_vector, self._matrix[i]))
+                for i, key in enumerate(self._keys)
+            ]
+            return sorted(scores, key=lambda x: x[1], reverse=True)[:k]
+
+        query = np.asarray(query_vector, dtype=np.float32).ravel()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            similarities = (self._matrix[:count] @ query) / (self._norms[:count] * np.linalg.norm(query))
+        # Zero vectors have no direction; rank them last instead of as NaN
+        similarities = np.nan_to_num(similarities, nan=-1.0)
+
+        # Partial selection of the k best, then sort only those k
+        if k < count:
+            top = np.argpartition(-similarities, k - 1)[:k]
+        else:
+            top = np.arange(count)
+        top = top[np.argsort(-similarities[top], kind="stable")]
+        return [(self._keys[i], float(similarities[i])) for i in top]
 
     def search_by_text(
         self,
@@ -53,12 +117,19 @@ class VectorDatabase:
         return [result[0] for result in results] if return_as_text else results
 
     def retrieve_from_key(self, key: str) -> np.array:
-        return self.vectors.get(key, None)
+        row = self._index.get(key)
+        # A copy, so in-place edits can't desync the stored vector from its norm
+        return None if row is None else self._matrix[row].copy()
 
     def get_metadata(self, key: str) -> Dict[str, Any]:
         """Get metadata for a specific key."""
         return self.metadata.get(key, {})
 
+    def get_metadata_batch(self, keys: List[str]) -> List[Dict[str, Any]]:
+        """Get metadata for several keys in one call, in the order given."""
+        metadata = self.metadata
+        return [metadata.get(key, {}) for key in keys]
+
     async def abuild_from_list(self, list_of_text: List[str]) -> "VectorDatabase":
         embeddings = await self.embedding_model.async_get_embeddings(list_of_text)
         for text, embedding in zip(list_of_text, embeddings):
@@ -1,14 +1,13 @@
 # Import required FastAPI components for building the API
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from fastapi import BackgroundTasks, FastAPI, HTTPException, UploadFile, File, Form
 from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 # Import Pydantic for data validation and settings management
 from pydantic import BaseModel
-# Import OpenAI client for interacting with OpenAI's API
-from openai import OpenAI
 import os
 import tempfile
 import uuid
+from contextlib import asynccontextmanager
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 import sys
@@ -21,13 +20,21 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from aimakerspace.pdf_utils import PDFFileLoader
 from aimakerspace.text_utils import CharacterTextSplitter
 from aimakerspace.vectordatabase import VectorDatabase
-from aimakerspace.openai_utils.embedding import EmbeddingModel
+from aimakerspace.openai_utils.embedding import EmbeddingModel, prefetch_tokenizer
 from aimakerspace.openai_utils.chatmodel import ChatOpenAI
+from aimakerspace.openai_utils.clients import get_openai_client
 from aimakerspace.rag_pipeline import RAGPipeline
 from aimakerspace.openai_utils.prompts import SystemRolePrompt, UserRolePrompt
 
+# Load the embedding tokenizer at startup so the first upload doesn't wait on it.
+# API keys arrive per request, so connections are warmed per session instead.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    prefetch_tokenizer()
+    yield
+
 # Initialize FastAPI application with a title
-app = FastAPI(title="OpenAI Chat API with RAG")
+app = FastAPI(title="OpenAI Chat API with RAG", lifespan=lifespan)
 
 # Configure CORS (Cross-Origin Resource Sharing) middleware
 # This allows the API to be accessed from different domains/origins
@@ -112,7 +119,7 @@ def get_or_create_session(session_id: Optional[str] = None, api_key: Optional[st
 async def chat(request: ChatRequest):
     try:
         # Initialize OpenAI client with the provided API key
-        client = OpenAI(api_key=request.api_key)
+        client = get_openai_client(request.api_key)
         
         # Create an async generator function for streaming responses
         async def generate():
@@ -141,6 +148,7 @@ async def chat(request: ChatRequest):
 # New PDF upload endpoint
 @app.post("/api/upload-pdf", response_model=UploadResponse)
 async def upload_pdf(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     session_id: Optional[str] = Form(None),
     api_key: str = Form(...)
@@ -171,8 +179,9 @@ async def upload_pdf(
         try:
             # Process PDF using aimakerspace
             print(f"📄 Loading PDF documents...")
-            pdf_loader = PDFFileLoader(tmp_file_path)
-            documents = pdf_loader.load_documents()
+            with PDFFileLoader(tmp_file_path) as pdf_loader:
+                # Parse off the event loop so other requests keep being served
+                documents = await pdf_loader.aload_documents()
             
             if not documents:
                 print(f"❌ No text extracted from PDF")
@@ -183,7 +192,9 @@ async def upload_pdf(
             # Split text into chunks
             print(f"✂️ Splitting text into chunks...")
             text_splitter = CharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-            chunks = text_splitter.split_texts(documents)
+            # Strip once here so retrieval hands back text that needs no copying
+            chunks = [chunk.strip() for chunk in text_splitter.split_texts(documents)]
+            chunks = [chunk for chunk in chunks if chunk]
             
             print(f"✅ Created {len(chunks)} chunks")
             
@@ -203,22 +214,17 @@ async def upload_pdf(
             else:
                 print(f"✅ Vector database already has proper embedding model")
             
-            print(f"💾 Processing chunks and storing embeddings...")
-            # Process chunks and add to vector database
-            for i, chunk in enumerate(chunks):
-                print(f"🔄 Processing chunk {i+1}/{len(chunks)}")
-                try:
-                    embedding = vector_db.embedding_model.get_embedding(chunk)
-                    metadata = {
-                        "filename": file.filename,
-                        "chunk_index": i,
-                        "upload_time": datetime.now().isoformat()
-                    }
-                    vector_db.insert(chunk, np.array(embedding), metadata)
-                    print(f"✅ Chunk {i+1} processed and stored")
-                except Exception as chunk_error:
-                    print(f"❌ Error processing chunk {i+1}: {chunk_error}")
-                    raise chunk_error
+            print(f"💾 Embedding {len(chunks)} chunks...")
+            # Embed all chunks in concurrent batched requests rather than one call per chunk
+            embeddings = await vector_db.embedding_model.async_get_embeddings(chunks)
+            upload_time = datetime.now().isoformat()
+            for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
+                metadata = {
+                    "filename": file.filename,
+                    "chunk_index": i,
+                    "upload_time": upload_time
+                }
+                vector_db.insert(chunk, np.array(embedding), metadata)
             
             print(f"✅ All chunks processed successfully")
             
@@ -227,6 +233,7 @@ async def upload_pdf(
             
             # Initialize RAG pipeline for this session
             print(f"🤖 Initializing RAG pipeline...")
+            first_pipeline = session["rag_pipeline"] is None
             chat_model = ChatOpenAI(model_name="gpt-4o-mini", api_key=api_key)
             session["rag_pipeline"] = RAGPipeline(
                 llm=chat_model,
@@ -236,6 +243,12 @@ async def upload_pdf(
             
             print(f"✅ RAG pipeline initialized")
             
+            # Embedding connections are already warm from this upload; open the
+            # chat connection after responding so the first question skips it.
+            # The warmup is a billable completion, so only do it once per session.
+            if first_pipeline:
+                background_tasks.add_task(chat_model.warmup)
+            
             return UploadResponse(
                 success=True,
                 message=f"Successfully processed {file.filename} into {len(chunks)} chunks",
@@ -309,7 +322,7 @@ async def rag_chat(request: RAGChatRequest):
                 if request.use_rag:
                     print(f"🔎 Searching documents for: {request.user_message}")
                     # Search for relevant documents
-                    search_results = rag_pipeline.search_documents(
+                    search_results = await rag_pipeline.asearch_documents(
                         query=request.user_message,
                         k=4,
                         return_metadata=True
@@ -319,28 +332,23 @@ async def rag_chat(request: RAGChatRequest):
                     
                     if search_results:
                         # Format context from search results
-                        context, metadata_info = rag_pipeline.format_context(search_results)
+                        context, metadata_info, _ = rag_pipeline.format_context(search_results)
                         
                         print(f"📝 Generated context length: {len(context)} characters")
                         print(f"🔗 Metadata: {metadata_info}")
                         
-                        # Generate response using RAG
-                        response = rag_pipeline.generate_response(
+                        # Stream the RAG response as the model generates it
+                        async for token in rag_pipeline.stream_generate(
                             query=request.user_message,
-                            context=context,
-                            metadata_info=metadata_info
-                        )
-                        
-                        print(f"💬 Generated response length: {len(response)} characters")
-                        
-                        # Stream the response
-                        yield response
+                            context=context
+                        ):
+                            yield token
                     else:
                         print(f"❌ No relevant search results found")
                         yield "I couldn't find relevant information in the uploaded documents to answer your question."
                 else:
                     # Fallback to regular chat without RAG
-                    client = OpenAI(api_key=request.api_key)
+                    client = get_openai_client(request.api_key)
                     stream = client.chat.completions.create(
                         model=request.model,
                         messages=[
@@ -0,0 +1,38 @@
+import asyncio
+from types import SimpleNamespace
+
+from aimakerspace.openai_utils.chatmodel import ChatOpenAI
+
+
+def _chunk(content):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+
+
+class _FakeCompletions:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.kwargs = None
+
+    async def create(self, **kwargs):
+        self.kwargs = kwargs
+
+        async def stream():
+            for chunk in self.chunks:
+                yield chunk
+
+        return stream()
+
+
+def test_astream_yields_text_and_merges_default_params():
+    model = ChatOpenAI(api_key="sk-test")
+    completions = _FakeCompletions([_chunk("Hel"), _chunk(None), SimpleNamespace(choices=[]), _chunk("lo")])
+    model.async_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    async def collect():
+        return [token async for token in model.astream([{"role": "user", "content": "hi"}], max_tokens=7)]
+
+    assert asyncio.run(collect()) == ["Hel", "lo"]
+    assert completions.kwargs["stream"] is True
+    assert completions.kwargs["max_tokens"] == 7
+    assert completions.kwargs["temperature"] == 0.2
+    assert completions.kwargs["messages"] == [{"role": "user", "content": "hi"}]
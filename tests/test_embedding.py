@@ -0,0 +1,148 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from aimakerspace.openai_utils import embedding
+from aimakerspace.openai_utils.embedding import EmbeddingModel, _pack_batches
+
+
+def _count_chars(text):
+    return len(text)
+
+
+def test_pack_batches_respects_token_budget_and_keeps_order():
+    texts = ["aaaa", "bb", "cccc", "d", "eeeeeee"]
+
+    batches = list(_pack_batches(texts, _count_chars, max_tokens=6, max_items=10))
+
+    assert batches == [["aaaa", "bb"], ["cccc", "d"], ["eeeeeee"]]
+    assert all(sum(map(len, batch)) <= 6 for batch in batches if len(batch) > 1)
+
+
+def test_pack_batches_respects_item_limit():
+    batches = list(_pack_batches(["a"] * 7, _count_chars, max_tokens=100, max_items=3))
+
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+
+
+def test_pack_batches_gives_oversized_text_its_own_batch():
+    batches = list(_pack_batches(["a", "b" * 50, "c"], _count_chars, max_tokens=10, max_items=10))
+
+    assert batches == [["a"], ["b" * 50], ["c"]]
+
+
+def test_pack_batches_with_no_texts():
+    assert list(_pack_batches([], _count_chars, max_tokens=10, max_items=10)) == []
+
+
+def test_token_counter_falls_back_to_utf8_bytes_without_tiktoken(monkeypatch):
+    monkeypatch.setattr(embedding, "tiktoken", None)
+
+    count = embedding._token_counter.__wrapped__("text-embedding-3-small")
+
+    assert count("héllo") == 6
+
+
+def _rate_limit_error():
+    request = httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+    return openai.RateLimitError("rate limited", response=httpx.Response(429, request=request), body=None)
+
+
+class _FlakyEmbeddings:
+    """Fails the first `failures` calls with `error`, then embeds each text as [len(text)]."""
+
+    def __init__(self, failures, error):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    async def create(self, input, model):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[float(len(text))]) for text in input])
+
+
+class _FakeAsyncClient:
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+        self.options = {}
+
+    def with_options(self, **options):
+        self.options.update(options)
+        return self
+
+
+def _model_with(embeddings, monkeypatch, **kwargs):
+    model = EmbeddingModel(api_key="sk-test", **kwargs)
+    model.async_client = _FakeAsyncClient(embeddings)
+    delays = []
+    real_sleep = asyncio.sleep
+
+    async def record_sleep(delay):
+        delays.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(embedding.asyncio, "sleep", record_sleep)
+    return model, delays
+
+
+def test_async_get_embeddings_retries_rate_limits_with_backoff(monkeypatch):
+    embeddings = _FlakyEmbeddings(failures=3, error=_rate_limit_error())
+    model, delays = _model_with(embeddings, monkeypatch)
+
+    result = asyncio.run(model.async_get_embeddings(["a", "bb"]))
+
+    assert result == [[1.0], [2.0]]
+    assert embeddings.calls == 4
+    assert model.async_client.options == {"max_retries": 0}
+    assert len(delays) == 3
+    for attempt, delay in enumerate(delays):
+        assert 2 ** attempt / 2 <= delay <= 2 ** attempt
+
+
+def test_async_get_embeddings_gives_up_after_max_attempts(monkeypatch):
+    embeddings = _FlakyEmbeddings(failures=10, error=_rate_limit_error())
+    model, delays = _model_with(embeddings, monkeypatch, max_attempts=3)
+
+    with pytest.raises(openai.RateLimitError):
+        asyncio.run(model.async_get_embeddings(["a"]))
+
+    assert embeddings.calls == 3
+    assert len(delays) == 2
+
+
+def test_async_get_embeddings_does_not_retry_other_errors(monkeypatch):
+    embeddings = _FlakyEmbeddings(failures=1, error=ValueError("bad input"))
+    model, delays = _model_with(embeddings, monkeypatch)
+
+    with pytest.raises(ValueError):
+        asyncio.run(model.async_get_embeddings(["a"]))
+
+    assert embeddings.calls == 1
+    assert delays == []
+
+
+
+def test_async_get_embeddings_is_the_only_retry_layer(monkeypatch):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(429, json={"error": {"message": "rate limited"}})
+
+    model, delays = _model_with(None, monkeypatch, max_attempts=3)
+    model.async_client = openai.AsyncOpenAI(
+        api_key="sk-test",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    with pytest.raises(openai.RateLimitError):
+        asyncio.run(model.async_get_embeddings(["a"]))
+
+    # One HTTP request per attempt: the SDK's own max_retries=2 is switched off
+    assert len(requests) == 3
+    assert len(delays) == 2
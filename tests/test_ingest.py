@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from aimakerspace import ingest
+from aimakerspace.text_utils import CharacterTextSplitter
+from aimakerspace.vectordatabase import VectorDatabase
+
+
+def _write_files(tmp_path, count):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"doc{i}.txt"
+        path.write_text(f"document {i}")
+        paths.append(str(path))
+    return paths
+
+
+def test_batch_ingest_bounds_loaded_files(tmp_path, monkeypatch):
+    paths = _write_files(tmp_path, 40)
+    workers, max_in_flight = 2, 2
+    state = {"loaded": 0, "peak": 0}
+    load_file = ingest._load_file
+
+    async def counting_load(path, executor):
+        documents = await load_file(path, executor)
+        state["loaded"] += 1
+        state["peak"] = max(state["peak"], state["loaded"])
+        return documents
+
+    consumed = []
+
+    async def slow_consumer(path, documents):
+        state["loaded"] -= 1
+        await asyncio.sleep(0.01)
+        consumed.append((path, documents))
+
+    monkeypatch.setattr(ingest, "_load_file", counting_load)
+    asyncio.run(ingest.batch_ingest(paths, slow_consumer, max_in_flight=max_in_flight, workers=workers))
+
+    assert sorted(path for path, _ in consumed) == sorted(paths)
+    assert all(documents == [f"document {paths.index(path)}"] for path, documents in consumed)
+    assert state["peak"] <= workers + max_in_flight
+
+
+def test_batch_ingest_propagates_consumer_errors(tmp_path):
+    paths = _write_files(tmp_path, 10)
+
+    async def failing_consumer(path, documents):
+        raise RuntimeError("consumer failed")
+
+    with pytest.raises(RuntimeError, match="consumer failed"):
+        asyncio.run(ingest.batch_ingest(paths, failing_consumer, max_in_flight=1, workers=2))
+
+
+def test_batch_ingest_with_no_paths():
+    async def consumer(path, documents):
+        raise AssertionError("consumer should not be called")
+
+    asyncio.run(ingest.batch_ingest([], consumer))
+
+
+class _LengthEmbeddings:
+    def __init__(self):
+        self.batches = []
+
+    async def async_get_embeddings(self, texts):
+        self.batches.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+def test_async_ingest_embeds_stripped_chunks_with_metadata(tmp_path):
+    (tmp_path / "a.txt").write_text("  alpha beta gamma delta  ")
+    (tmp_path / "b.txt").write_text("   ")
+    paths = [str(tmp_path / "a.txt"), str(tmp_path / "b.txt")]
+    embeddings = _LengthEmbeddings()
+    vector_db = VectorDatabase(embedding_model=embeddings)
+    splitter = CharacterTextSplitter(chunk_size=12, chunk_overlap=2)
+
+    counts = asyncio.run(ingest.async_ingest(paths, vector_db, text_splitter=splitter, workers=2))
+
+    # Files finish loading in any order, so find the non-empty batch
+    (chunks,) = [batch for batch in embeddings.batches if batch]
+    assert counts == {paths[0]: len(chunks), paths[1]: 0}
+    assert all(chunk == chunk.strip() and chunk for chunk in chunks)
+    assert len(vector_db) == len(chunks)
+    for i, chunk in enumerate(chunks):
+        assert vector_db.get_metadata(chunk) == {"filename": "a.txt", "chunk_index": i}
+        assert vector_db.retrieve_from_key(chunk)[0] == len(chunk)
+
+
+def test_async_ingest_requires_an_embedding_model():
+    with pytest.raises(ValueError, match="Embedding model not initialized"):
+        asyncio.run(ingest.async_ingest([], VectorDatabase()))
@@ -0,0 +1,123 @@
+import json
+
+import pytest
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject, NumberObject
+
+from aimakerspace import pdf_utils
+from aimakerspace.pdf_utils import PDFFileLoader
+
+
+def _write_blank_pdf(path, pages):
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=72, height=72)
+    with open(path, "wb") as f:
+        writer.write(f)
+    return str(path)
+
+
+def test_page_count_reads_count_without_flattening(tmp_path):
+    loader = PDFFileLoader(_write_blank_pdf(tmp_path / "blank.pdf", 20))
+
+    assert loader.get_page_count() == 20
+    assert loader.reader.flattened_pages is None
+
+
+def test_page_count_falls_back_when_count_is_missing(tmp_path):
+    loader = PDFFileLoader(_write_blank_pdf(tmp_path / "blank.pdf", 3))
+    loader._load_reader()
+    del loader.reader.trailer["/Root"]["/Pages"][NameObject("/Count")]
+
+    assert loader.get_page_count() == 3
+
+
+def test_page_text_cache_is_off_by_default(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_utils, "PDF_CACHE_DIR", None)
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    loader = PDFFileLoader(_write_blank_pdf(tmp_path / "blank.pdf", 2))
+
+    assert loader.load_documents() == []
+    assert not (tmp_path / "home").exists()
+
+
+def test_page_text_cache_round_trip(tmp_path):
+    cache_dir = tmp_path / "cache"
+    pdf_path = _write_blank_pdf(tmp_path / "blank.pdf", 2)
+
+    assert PDFFileLoader(pdf_path, cache_dir=str(cache_dir)).load_documents() == []
+    (entry,) = cache_dir.iterdir()
+    entry.write_text(json.dumps({"pages": ["cached page"]}))
+
+    loader = PDFFileLoader(pdf_path, cache_dir=str(cache_dir))
+    assert loader.load_documents() == ["cached page"]
+    assert loader.load_documents(force_refresh=True) == []
+
+
+def test_page_text_cache_is_keyed_by_the_backend_that_ran(tmp_path, monkeypatch):
+    class BrokenPymupdf:
+        VersionBind = "test"
+
+        @staticmethod
+        def open(path):
+            raise RuntimeError("cannot open")
+
+    monkeypatch.setattr(pdf_utils, "pymupdf", BrokenPymupdf)
+    monkeypatch.setattr(pdf_utils, "_PYMUPDF_BACKEND", "pymupdf-test")
+    cache_dir = tmp_path / "cache"
+    pdf_path = _write_blank_pdf(tmp_path / "blank.pdf", 2)
+
+    PDFFileLoader(pdf_path, cache_dir=str(cache_dir)).load_documents()
+    (entry,) = cache_dir.iterdir()
+    assert entry.name.endswith(f"-{pdf_utils._PYPDF_BACKEND}.json")
+
+    entry.write_text(json.dumps({"pages": ["cached page"]}))
+    assert PDFFileLoader(pdf_path, cache_dir=str(cache_dir)).load_documents() == ["cached page"]
+
+
+def test_get_metadata_force_refresh_rereads_the_file(tmp_path):
+    pdf_path = _write_blank_pdf(tmp_path / "blank.pdf", 1)
+    loader = PDFFileLoader(pdf_path)
+    assert "/Title" not in loader.get_metadata()
+
+    writer = PdfWriter()
+    writer.add_blank_page(width=72, height=72)
+    writer.add_metadata({"/Title": "Updated"})
+    with open(pdf_path, "wb") as f:
+        writer.write(f)
+
+    assert "/Title" not in loader.get_metadata()
+    assert loader.get_metadata(force_refresh=True)["/Title"] == "Updated"
+
+
+def _write_text_pdf(path, pages, count=None):
+    writer = PdfWriter()
+    font = DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    })
+    for i in range(pages):
+        page = writer.add_blank_page(width=200, height=50)
+        content = DecodedStreamObject()
+        content.set_data(f"BT /F1 12 Tf 10 20 Td (Page {i + 1}) Tj ET".encode())
+        page[NameObject("/Contents")] = writer._add_object(content)
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})
+        })
+    if count is not None:
+        writer.root_object["/Pages"][NameObject("/Count")] = NumberObject(count)
+    with open(path, "wb") as f:
+        writer.write(f)
+    return str(path)
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_load_documents_ignores_a_tampered_page_count(tmp_path, monkeypatch, max_workers):
+    monkeypatch.setattr(pdf_utils, "pymupdf", None)
+    pdf_path = _write_text_pdf(tmp_path / "tampered.pdf", 20, count=10)
+    assert PDFFileLoader(pdf_path).get_page_count() == 10
+
+    documents = PDFFileLoader(pdf_path).load_documents(max_workers=max_workers)
+
+    assert documents == [f"Page {i + 1}" for i in range(20)]
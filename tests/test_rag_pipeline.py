@@ -0,0 +1,80 @@
+import asyncio
+import logging
+
+from aimakerspace.rag_pipeline import RAGPipeline
+from aimakerspace.vectordatabase import VectorDatabase
+
+
+def _pipeline():
+    return RAGPipeline(llm=None, vector_db=VectorDatabase())
+
+
+def test_format_context_skips_empty_results_and_dedupes_sources_in_order():
+    results = [
+        {"text": " first ", "score": 0.5, "metadata": {"filename": "b.pdf", "chunk_index": 3}},
+        {"text": "   ", "score": 0.4, "metadata": {"filename": "ignored.pdf"}},
+        {"text": "second", "score": 0.25},
+        {"text": "third", "score": 0.1, "metadata": {"filename": "a.pdf"}},
+        {"text": "fourth", "score": 0.05, "metadata": {"filename": "b.pdf"}},
+    ]
+
+    context, metadata_info, sources = _pipeline().format_context(results)
+
+    assert context == "\n\n---\n\n".join([
+        "[Source: b.pdf]\nfirst",
+        "[Source: Document 3]\nsecond",
+        "[Source: a.pdf]\nthird",
+        "[Source: b.pdf]\nfourth",
+    ])
+    assert metadata_info == (
+        "Source: b.pdf, Relevance: 0.500, Chunk: 3 | Source: Document 3, Relevance: 0.250"
+        " | Source: a.pdf, Relevance: 0.100 | Source: b.pdf, Relevance: 0.050"
+    )
+    assert sources == ["b.pdf", "a.pdf"]
+
+
+def test_format_context_with_no_results():
+    assert _pipeline().format_context([]) == ("", "", [])
+
+
+class _StreamingLLM:
+    def __init__(self, tokens, error=None):
+        self.tokens = tokens
+        self.error = error
+        self.calls = []
+
+    async def astream(self, messages, **kwargs):
+        self.calls.append((messages, kwargs))
+        for token in self.tokens:
+            yield token
+        if self.error:
+            raise self.error
+
+
+async def _collect(stream):
+    return [token async for token in stream]
+
+
+def test_stream_generate_yields_tokens_with_style_token_cap():
+    llm = _StreamingLLM(["Hello", ", ", "world"])
+    pipeline = RAGPipeline(llm=llm, vector_db=VectorDatabase(), response_style="detailed")
+
+    tokens = asyncio.run(_collect(pipeline.stream_generate("question?", "[Source: a.pdf]\ntext")))
+
+    assert tokens == ["Hello", ", ", "world"]
+    ((messages, kwargs),) = llm.calls
+    assert kwargs == {"max_tokens": 2048}
+    assert messages[0]["role"] == "system"
+    assert "question?" in messages[1]["content"] and "[Source: a.pdf]" in messages[1]["content"]
+
+
+def test_stream_generate_reports_errors_as_a_final_message(caplog):
+    llm = _StreamingLLM(["partial"], error=RuntimeError("boom"))
+    pipeline = RAGPipeline(llm=llm, vector_db=VectorDatabase())
+
+    with caplog.at_level(logging.ERROR):
+        tokens = asyncio.run(_collect(pipeline.stream_generate("q", "context")))
+
+    assert tokens[0] == "partial"
+    assert tokens[1] == "I encountered an error while generating a response: boom"
+    assert [record.name for record in caplog.records] == ["aimakerspace.rag_pipeline"]
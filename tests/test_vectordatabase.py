@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from aimakerspace.vectordatabase import VectorDatabase, cosine_similarity
+
+
+def _reference_search(vectors, query, k):
+    """The original per-vector cosine loop the matrix search replaced."""
+    scores = [(key, cosine_similarity(query, vector)) for key, vector in vectors.items()]
+    return sorted(scores, key=lambda x: x[1], reverse=True)[:k]
+
+
+def _random_db(count=200, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = {f"doc{i}": rng.standard_normal(dim) for i in range(count)}
+    db = VectorDatabase()
+    for key, vector in vectors.items():
+        db.insert(key, vector)
+    return db, vectors, rng
+
+
+@pytest.mark.parametrize("k", [1, 5, 200, 500])
+def test_search_matches_reference_cosine_ordering(k):
+    db, vectors, rng = _random_db()
+    query = rng.standard_normal(16)
+
+    results = db.search(list(query), k=k)
+    expected = _reference_search(vectors, query, k)
+
+    assert [key for key, _ in results] == [key for key, _ in expected]
+    np.testing.assert_allclose([score for _, score in results], [score for _, score in expected], atol=1e-5)
+
+
+def test_search_ranks_zero_vectors_last():
+    db, vectors, rng = _random_db(count=20)
+    db.insert("zero", np.zeros(16))
+    query = rng.standard_normal(16)
+
+    results = db.search(query, k=len(db))
+
+    assert [key for key, _ in results[:-1]] == [key for key, _ in _reference_search(vectors, query, 20)]
+    assert results[-1] == ("zero", -1.0)
+
+
+def test_search_with_custom_distance_measure():
+    db, vectors, rng = _random_db(count=20)
+    query = rng.standard_normal(16)
+
+    def negative_distance(a, b):
+        return -np.linalg.norm(np.asarray(a) - np.asarray(b))
+
+    results = db.search(query, k=3, distance_measure=negative_distance)
+    expected = sorted(vectors, key=lambda key: np.linalg.norm(query - vectors[key]))[:3]
+
+    assert [key for key, _ in results] == expected
+
+
+def test_insert_overwrites_existing_key_and_rejects_wrong_dimension():
+    db = VectorDatabase()
+    db.insert("a", [1.0, 0.0], {"filename": "a.pdf"})
+    db.insert("a", [0.0, 1.0])
+
+    assert len(db) == 1
+    np.testing.assert_array_equal(db.retrieve_from_key("a"), [0.0, 1.0])
+    assert db.get_metadata("a") == {"filename": "a.pdf"}
+    assert db.retrieve_from_key("missing") is None
+    with pytest.raises(ValueError):
+        db.insert("b", [1.0, 0.0, 0.0])
+
+
+def test_search_on_empty_database():
+    assert VectorDatabase().search([1.0, 0.0], k=3) == []
+
+
+def test_get_metadata_batch_keeps_key_order():
+    db = VectorDatabase()
+    db.insert("a", [1.0, 0.0], {"filename": "a.pdf"})
+    db.insert("b", [0.0, 1.0])
+
+    assert db.get_metadata_batch(["b", "missing", "a"]) == [{}, {}, {"filename": "a.pdf"}]
+
+
+def test_stored_vectors_cannot_be_changed_behind_the_database():
+    db = VectorDatabase()
+    db.insert("a", [1.0, 0.0])
+    db.insert("b", [0.6, 0.8])
+
+    retrieved = db.retrieve_from_key("a")
+    retrieved[:] = [0.0, 5.0]
+    assert db.search([1.0, 0.0], k=1) == [("a", 1.0)]
+
+    with pytest.raises(TypeError):
+        db.vectors["c"] = np.array([1.0, 1.0])
+    with pytest.raises(ValueError):
+        db.vectors["a"][0] = 0.0
+    assert set(db.vectors) == {"a", "b"}
+    np.testing.assert_array_equal(db.vectors["a"], [1.0, 0.0])